@@ -20,6 +20,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 # is populated before importing code that may import ORM models.
 django_asgi_app = get_asgi_application()
 
+from sensor_readings.auth import TokenAuthMiddleware
 from sensor_readings.routing import websocket_urlpatterns
 
 # For development, allow all origins. In production, use AllowedHostsOriginValidator
@@ -29,6 +30,13 @@ if settings.DEBUG:
     # Development: Allow all origins and anonymous WebSocket connections
     # Skip AuthMiddlewareStack to allow unauthenticated connections
     websocket_application = URLRouter(websocket_urlpatterns)
+elif settings.WEBSOCKET_LEAN_MODE:
+    # Production, lean mode: signed ?token= auth with no DB hit on connect
+    websocket_application = AllowedHostsOriginValidator(
+        TokenAuthMiddleware(
+            URLRouter(websocket_urlpatterns)
+        )
+    )
 else:
     # Production: Validate origins and require authentication
     websocket_application = AllowedHostsOriginValidator(
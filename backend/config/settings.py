@@ -38,6 +38,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://154.72.210.102:3000",
 ]
 
+# Let the frontend send its session cookie when fetching WebSocket tokens
+CORS_ALLOW_CREDENTIALS = True
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -156,6 +159,20 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 100,
 }
 
+# Cache configuration (shared with the listener worker for invalidation)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://{}:{}/1".format(
+            os.environ.get("REDIS_HOST", "localhost"),
+            os.environ.get("REDIS_PORT", 6379),
+        ),
+    },
+}
+
+# Seconds a cached readings list response is kept
+SENSOR_READINGS_CACHE_TIMEOUT = int(os.environ.get("SENSOR_READINGS_CACHE_TIMEOUT", 300))
+
 # Channels configuration
 CHANNEL_LAYERS = {
     "default": {
@@ -170,3 +187,9 @@ CHANNEL_LAYERS = {
         },
     },
 }
+
+# Lean WebSocket mode: token auth, shared per-process relay, heartbeats
+WEBSOCKET_LEAN_MODE = os.environ.get("WEBSOCKET_LEAN_MODE", "false").lower() in ("true", "1", "yes")
+WEBSOCKET_TOKEN_MAX_AGE = int(os.environ.get("WEBSOCKET_TOKEN_MAX_AGE", 3600))
+WEBSOCKET_HEARTBEAT_INTERVAL = int(os.environ.get("WEBSOCKET_HEARTBEAT_INTERVAL", 30))
+WEBSOCKET_IDLE_TIMEOUT = int(os.environ.get("WEBSOCKET_IDLE_TIMEOUT", 90))
@@ -1,10 +1,16 @@
 from django.contrib import admin
-from .models import SensorReading
+from .models import Sensor, SensorReading
+
+
+@admin.register(Sensor)
+class SensorAdmin(admin.ModelAdmin):
+    list_display = ('id', 'sensor_id', 'version', 'created_at')
+    search_fields = ('sensor_id',)
 
 
 @admin.register(SensorReading)
 class SensorReadingAdmin(admin.ModelAdmin):
     list_display = ('sensor_id', 'value', 'timestamp')
-    list_filter = ('sensor_id', 'timestamp')
-    search_fields = ('sensor_id',)
-
+    list_filter = ('sensor_key__sensor_id', 'timestamp')
+    search_fields = ('sensor_key__sensor_id',)
+    list_select_related = ('sensor_key',)
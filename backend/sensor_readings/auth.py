@@ -0,0 +1,37 @@
+from urllib.parse import parse_qs
+
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'sensor_readings.websocket'
+TOKEN_MAX_AGE = getattr(settings, 'WEBSOCKET_TOKEN_MAX_AGE', 3600)
+
+
+def issue_token(user):
+    """Return a signed, expiring WebSocket token for a user"""
+    return signing.dumps({'user_id': user.pk}, salt=TOKEN_SALT)
+
+
+def read_token(token):
+    """Return the user id carried by a token, or None if it is invalid or expired"""
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE)['user_id']
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """
+    Authenticate WebSocket connections from a signed ?token= query parameter.
+
+    Unlike AuthMiddlewareStack this needs no session or user lookup, so
+    connecting costs no database queries. Sets scope['user_id'], which is
+    None when the token is missing, invalid or expired.
+    """
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        token = query.get('token', [None])[0]
+        scope = dict(scope, user_id=read_token(token) if token else None)
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import SensorReading
+
+LIST_TIMEOUT = getattr(settings, 'SENSOR_READINGS_CACHE_TIMEOUT', 300)
+
+_PREFIX = 'sensor_readings'
+_GENERATION_KEY = f"{_PREFIX}:generation"
+
+
+def _scope(sensor_id):
+    # Distinct prefixes so no sensor_id can collide with the global scope
+    return f"sensor:{sensor_id}" if sensor_id else "__all__"
+
+
+def _latest_keys(sensor_id, generation):
+    keys = [f"{_PREFIX}:latest:{generation}:{_scope(None)}"]
+    if sensor_id:
+        keys.append(f"{_PREFIX}:latest:{generation}:{_scope(sensor_id)}")
+    return keys
+
+
+def list_cache_key(sensor_id, limit, latest_id):
+    """
+    Key for a cached list response.
+
+    The newest reading id is part of the key, so a new reading for the
+    sensor makes older entries unreachable without touching other sensors.
+    """
+    return f"{_PREFIX}:list:{limit}:{latest_id}:{_scope(sensor_id)}"
+
+
+def get_latest(sensor_id=None):
+    """
+    Return (newest reading id, last modified epoch seconds) for a sensor,
+    or across all sensors when sensor_id is empty.
+
+    Served from the cache once primed; falls back to a single indexed
+    query on a cold cache. Markers expire after LIST_TIMEOUT, so a missed
+    notification can't keep a stale marker alive for long.
+    """
+    key = _latest_keys(sensor_id, cache.get(_GENERATION_KEY, 0))[-1]
+    latest = cache.get(key)
+    if latest is not None:
+        return latest
+
+    queryset = SensorReading.objects.all()
+    if sensor_id:
+        queryset = queryset.filter(sensor_key__sensor_id=sensor_id)
+    row = queryset.order_by('-id').values_list('id', 'timestamp').first()
+    latest = (row[0], int(row[1].timestamp())) if row else (0, None)
+
+    # add() so a concurrent record_reading() from the listener always wins
+    cache.add(key, latest, timeout=LIST_TIMEOUT)
+    return cache.get(key, latest)
+
+
+def record_reading(reading_id, sensor_id, timestamp):
+    """
+    Mark a committed reading as the newest for its sensor and globally.
+
+    Called from the NOTIFY listener, which only sees rows after commit.
+    """
+    latest = (reading_id, int(timestamp.timestamp()) if timestamp else None)
+    keys = _latest_keys(sensor_id, cache.get(_GENERATION_KEY, 0))
+
+    # Notifications can arrive out of order within a poll; never move back
+    current = cache.get_many(keys)
+    cache.set_many({
+        key: latest
+        for key in keys
+        if key not in current or current[key][0] < reading_id
+    }, timeout=LIST_TIMEOUT)
+
+
+def forget_latest(sensor_id):
+    """
+    Drop the markers for a sensor so the next request rebuilds them from
+    the DB. Used after a write so the writer sees its own reading at once.
+    """
+    cache.delete_many(_latest_keys(sensor_id, cache.get(_GENERATION_KEY, 0)))
+
+
+def reset_latest():
+    """
+    Invalidate every marker by moving to a new key generation.
+
+    Called whenever the listener (re)connects, since notifications sent
+    while it was away are lost. Old markers simply expire.
+    """
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, 1, timeout=None)
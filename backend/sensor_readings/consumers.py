@@ -1,6 +1,7 @@
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
+from .relay import relay
 
 logger = logging.getLogger(__name__)
 
@@ -64,3 +65,31 @@ class SensorReadingsConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"Error sending message: {e}")
 
+
+class LeanSensorReadingsConsumer(AsyncWebsocketConsumer):
+    """
+    Low-footprint consumer for large numbers of mostly idle dashboards.
+
+    Sockets get no channel or group membership of their own; the
+    process-wide relay receives sensor_group messages and fans them out.
+    Clients should answer {"type": "heartbeat"} frames with any message
+    (e.g. {"type": "pong"}) or they are closed after WEBSOCKET_IDLE_TIMEOUT.
+    """
+    # No per-socket channel layer; see relay.SensorRelay
+    channel_layer_alias = None
+
+    async def connect(self):
+        # TokenAuthMiddleware sets user_id; None means a missing or bad token
+        if 'user_id' in self.scope and self.scope['user_id'] is None:
+            await self.close(code=4401)
+            return
+
+        await self.accept()
+        relay.register(self)
+
+    async def disconnect(self, close_code):
+        relay.unregister(self)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Any client frame counts as activity, including heartbeat replies
+        relay.touch(self)
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+import asyncio
+import resource
+import time
+from urllib.parse import urlencode, urlparse
+
+import websockets
+
+
+def read_rss(pid):
+    """Resident set size of a process in bytes (Linux only)"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise CommandError(f"Could not read RSS for pid {pid}")
+
+
+class Command(BaseCommand):
+    help = "Open many idle WebSocket connections and report server RSS per connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pid", type=int, required=True, help="PID of the ASGI server process")
+        parser.add_argument("--url", default="ws://localhost:8000/ws/sensor-readings/")
+        parser.add_argument("--connections", type=int, default=50000, help="Target number of idle sockets")
+        parser.add_argument("--batch", type=int, default=500, help="Connections opened concurrently")
+        parser.add_argument("--hold", type=int, default=30, help="Seconds to hold sockets before measuring")
+        parser.add_argument("--token", help="Lean-mode WebSocket token (from /ws-token/), required in production")
+        parser.add_argument("--origin", help="Origin header for AllowedHostsOriginValidator (default: from --url)")
+
+    def handle(self, *args, **options):
+        # Each socket is a file descriptor on this side too
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        if hard < options["connections"] + 100:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Open file limit is {hard}; raise it (ulimit -n) to reach {options['connections']} sockets"
+            ))
+
+        asyncio.run(self.run(**options))
+
+    async def run(self, pid, url, connections, batch, hold, token=None, origin=None, **kwargs):
+        if token:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode({'token': token})}"
+        if not origin:
+            parsed = urlparse(url)
+            origin = f"{'https' if parsed.scheme == 'wss' else 'http'}://{parsed.netloc}"
+
+        baseline = read_rss(pid)
+        self.stdout.write(f"Baseline RSS: {baseline / 1024 / 1024:.1f} MiB")
+
+        sockets = []
+        started = time.monotonic()
+        while len(sockets) < connections:
+            count = min(batch, connections - len(sockets))
+            results = await asyncio.gather(
+                *(websockets.connect(url, origin=origin, ping_interval=None) for _ in range(count)),
+                return_exceptions=True,
+            )
+            opened = [r for r in results if not isinstance(r, Exception)]
+            sockets.extend(opened)
+            if not opened:
+                self.stdout.write(self.style.ERROR(f"❌ Could not open more connections: {results[0]}"))
+                break
+            self.stdout.write(f"Opened {len(sockets)} connections")
+
+        self.stdout.write(f"Opened {len(sockets)} connections in {time.monotonic() - started:.1f}s, holding {hold}s...")
+        await asyncio.sleep(hold)
+
+        measured = read_rss(pid)
+        if sockets:
+            per_connection = (measured - baseline) / len(sockets)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ RSS {measured / 1024 / 1024:.1f} MiB with {len(sockets)} idle sockets, "
+                f"{per_connection / 1024:.1f} KiB per connection"
+            ))
+
+        await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
@@ -4,6 +4,10 @@ import json
 import time
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db import close_old_connections
+from django.utils.dateparse import parse_datetime
+from sensor_readings.cache import record_reading, reset_latest
+from sensor_readings.registry import expand_payload
 
 
 class Command(BaseCommand):
@@ -49,6 +53,9 @@ class Command(BaseCommand):
                 cur = conn.cursor()
                 
                 cur.execute("LISTEN sensor_updates;")
+
+                # Notifications sent while disconnected are lost; rebuild markers
+                reset_latest()
                 
                 self.stdout.write(self.style.SUCCESS("✅ Listening for sensor updates..."))
                 self.stdout.flush()
@@ -59,7 +66,17 @@ class Command(BaseCommand):
                     
                     while conn.notifies:
                         notify = conn.notifies.pop()
-                        payload = json.loads(notify.payload)
+                        # The trigger sends the compact row; resolve sensor_key
+                        # back to sensor_id/metadata for WebSocket clients
+                        payload = expand_payload(json.loads(notify.payload))
+
+                        # Bump the newest-reading marker so cached list responses
+                        # and ETags for this sensor are invalidated
+                        record_reading(
+                            payload['id'],
+                            payload['sensor_id'],
+                            parse_datetime(payload['timestamp']) if payload.get('timestamp') else None,
+                        )
                         
                         # When a notification arrives, broadcasts it via Redis channel layer to WebSocket clients
                         async_to_sync(channel_layer.group_send)(
@@ -109,6 +126,8 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f"❌ Unexpected error: {e}"))
                 import traceback
                 self.stdout.write(traceback.format_exc())
+                # Drop a broken ORM connection used for registry lookups
+                close_old_connections()
                 self.stdout.write(f"Retrying in {retry_delay} seconds...")
                 if cur:
                     try:
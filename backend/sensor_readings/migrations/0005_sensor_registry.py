@@ -0,0 +1,92 @@
+# Generated manually
+
+from django.db import migrations, models
+from django.db.models import Min
+import django.db.models.deletion
+
+
+def populate_sensor_registry(apps, schema_editor):
+    """Create one Sensor row per distinct (sensor_id, metadata) and link readings"""
+    Sensor = apps.get_model('sensor_readings', 'Sensor')
+    SensorReading = apps.get_model('sensor_readings', 'SensorReading')
+
+    versions = {}
+    sensors = []
+    pairs = (
+        SensorReading.objects.values('sensor_id', 'metadata')
+        .annotate(first_id=Min('id'))
+        .order_by('first_id')
+    )
+    for pair in pairs:
+        version = versions.get(pair['sensor_id'], 0) + 1
+        versions[pair['sensor_id']] = version
+        sensors.append(Sensor(sensor_id=pair['sensor_id'], version=version, metadata=pair['metadata']))
+    Sensor.objects.bulk_create(sensors, batch_size=1000)
+
+    # One set-based join instead of a full-table UPDATE per pair
+    schema_editor.execute("""
+        UPDATE sensor_readings SET sensor_key = sensors.id
+        FROM sensors
+        WHERE sensors.sensor_id = sensor_readings.sensor_id
+          AND sensors.metadata = sensor_readings.metadata
+    """)
+
+
+def restore_inline_columns(apps, schema_editor):
+    """Copy sensor_id and metadata back onto each reading"""
+    schema_editor.execute("""
+        UPDATE sensor_readings SET sensor_id = sensors.sensor_id, metadata = sensors.metadata
+        FROM sensors
+        WHERE sensors.id = sensor_readings.sensor_key
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensor_readings', '0004_add_created_updated_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sensor',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('sensor_id', models.CharField(db_index=True, max_length=100)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'sensors',
+                'ordering': ['sensor_id', '-version'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('sensor_id', 'version'), name='unique_sensor_version'),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name='sensorreading',
+            name='sensor_key',
+            field=models.ForeignKey(
+                db_column='sensor_key',
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='readings',
+                to='sensor_readings.sensor',
+            ),
+        ),
+        # Nullable while readings are linked, so the reverse can re-add the
+        # columns empty and restore NOT NULL only after copying values back
+        migrations.AlterField(
+            model_name='sensorreading',
+            name='sensor_id',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sensorreading',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict, null=True),
+        ),
+        migrations.RunPython(populate_sensor_registry, restore_inline_columns),
+    ]
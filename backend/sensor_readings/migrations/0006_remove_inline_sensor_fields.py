@@ -0,0 +1,34 @@
+# Generated manually
+# Kept separate from 0005 so the data backfill commits before ALTER TABLE
+# (PostgreSQL rejects schema changes with pending deferred FK checks).
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensor_readings', '0005_sensor_registry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sensorreading',
+            name='sensor_key',
+            field=models.ForeignKey(
+                db_column='sensor_key',
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='readings',
+                to='sensor_readings.sensor',
+            ),
+        ),
+        migrations.RemoveField(
+            model_name='sensorreading',
+            name='sensor_id',
+        ),
+        migrations.RemoveField(
+            model_name='sensorreading',
+            name='metadata',
+        ),
+    ]
@@ -1,11 +1,40 @@
 from django.db import models
 
 
+class Sensor(models.Model):
+    """
+    Registry of sensors, one row per metadata version.
+
+    Readings reference a row by its small integer key instead of repeating
+    the sensor_id string and metadata JSON on every insert.
+    """
+    id = models.AutoField(primary_key=True)
+    sensor_id = models.CharField(max_length=100, db_index=True)
+    version = models.PositiveIntegerField(default=1)
+    metadata = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sensors'
+        ordering = ['sensor_id', '-version']
+        constraints = [
+            models.UniqueConstraint(fields=['sensor_id', 'version'], name='unique_sensor_version'),
+        ]
+
+    def __str__(self):
+        return f"Sensor {self.sensor_id} (v{self.version})"
+
+
 class SensorReading(models.Model):
-    sensor_id = models.CharField(max_length=100)
+    sensor_key = models.ForeignKey(
+        Sensor,
+        on_delete=models.PROTECT,
+        db_column='sensor_key',
+        related_name='readings',
+    )
     value = models.FloatField()
     timestamp = models.DateTimeField(auto_now_add=True)
-    metadata = models.JSONField(default=dict, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -14,6 +43,13 @@ class SensorReading(models.Model):
         db_table = 'sensor_readings'
         ordering = ['-timestamp']
 
+    @property
+    def sensor_id(self):
+        return self.sensor_key.sensor_id
+
+    @property
+    def metadata(self):
+        return self.sensor_key.metadata
+
     def __str__(self):
         return f"Sensor {self.sensor_id}: {self.value} at {self.timestamp}"
-
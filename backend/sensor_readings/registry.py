@@ -0,0 +1,125 @@
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import Sensor
+
+CACHE_SIZE = getattr(settings, 'SENSOR_REGISTRY_CACHE_SIZE', 1024)
+
+
+def _canonical(metadata):
+    """Stable JSON encoding so equal metadata dicts share a cache entry"""
+    return json.dumps(metadata or {}, sort_keys=True, separators=(',', ':'))
+
+
+class _LRUCache:
+    """Small thread-safe LRU mapping of immutable values"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_resolved = _LRUCache(CACHE_SIZE)
+
+
+def resolve_sensor(sensor_id, metadata=None):
+    """
+    Return (key, sensor_id, metadata) of the Sensor registry row for a
+    sensor_id and metadata pair.
+
+    Repeated calls with the same pair are served from an in-process LRU
+    cache, so the ingest path only touches the sensors table the first
+    time a sensor (or a new metadata version of it) is seen. The returned
+    metadata is a fresh dict on every call.
+    """
+    metadata_json = _canonical(metadata)
+    cache_key = (sensor_id, metadata_json)
+
+    key = _resolved.get(cache_key)
+    if key is None:
+        key = _lookup_or_create(sensor_id, json.loads(metadata_json))
+        # Only cache once committed, so a rolled back outer transaction
+        # can't leave a key to a row that doesn't exist
+        transaction.on_commit(lambda: _resolved.put(cache_key, key))
+
+    return key, sensor_id, json.loads(metadata_json)
+
+
+def _lookup_or_create(sensor_id, metadata):
+    # Retry if another worker registers the same version concurrently
+    for _ in range(3):
+        key = (
+            Sensor.objects.filter(sensor_id=sensor_id, metadata=metadata)
+            .values_list('id', flat=True)
+            .first()
+        )
+        if key is not None:
+            return key
+
+        latest = Sensor.objects.filter(sensor_id=sensor_id).aggregate(v=Max('version'))['v']
+        try:
+            with transaction.atomic():
+                return Sensor.objects.create(
+                    sensor_id=sensor_id,
+                    version=(latest or 0) + 1,
+                    metadata=metadata,
+                ).pk
+        except IntegrityError:
+            continue
+
+    raise IntegrityError(f"Could not register metadata version for sensor {sensor_id}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _describe(key):
+    sensor = Sensor.objects.get(pk=key)
+    return sensor.sensor_id, _canonical(sensor.metadata)
+
+
+def describe_sensor(key):
+    """Return (sensor_id, metadata) for a registry key"""
+    sensor_id, metadata_json = _describe(key)
+    return sensor_id, json.loads(metadata_json)
+
+
+def expand_payload(payload):
+    """
+    Turn a compact NOTIFY payload (carrying sensor_key) back into the
+    sensor_id/metadata shape that WebSocket clients expect.
+    """
+    key = payload.pop('sensor_key', None)
+    if key is not None:
+        sensor_id, metadata = describe_sensor(key)
+        payload['sensor_id'] = sensor_id
+        payload['metadata'] = metadata
+    return payload
+
+
+def clear_cache():
+    _resolved.clear()
+    _describe.cache_clear()
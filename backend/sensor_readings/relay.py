@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+import time
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GROUP = "sensor_group"
+HEARTBEAT_INTERVAL = getattr(settings, 'WEBSOCKET_HEARTBEAT_INTERVAL', 30)
+IDLE_TIMEOUT = getattr(settings, 'WEBSOCKET_IDLE_TIMEOUT', 90)
+HEARTBEAT = json.dumps({'type': 'heartbeat'})
+
+
+class SensorRelay:
+    """
+    Process-wide fan-out for lean WebSocket connections.
+
+    One channel per process joins sensor_group and pushes each message to
+    every local socket, so sockets hold no channel or Redis group membership
+    of their own. The only per-socket state is the time of the client's last
+    frame, used to send heartbeats and close idle connections.
+    """
+
+    def __init__(self):
+        self.sockets = {}
+        self._task = None
+
+    def register(self, consumer):
+        self.sockets[consumer] = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def unregister(self, consumer):
+        self.sockets.pop(consumer, None)
+
+    def touch(self, consumer):
+        if consumer in self.sockets:
+            self.sockets[consumer] = time.monotonic()
+
+    async def _run(self):
+        await asyncio.gather(self._relay(), self._sweep())
+
+    async def _relay(self):
+        channel_layer = get_channel_layer()
+        # Re-join before the layer expires our group membership
+        refresh = getattr(channel_layer, 'group_expiry', 86400) / 2
+
+        while True:
+            try:
+                channel = await channel_layer.new_channel()
+                await channel_layer.group_add(GROUP, channel)
+                joined = time.monotonic()
+                logger.info(f"Relay joined {GROUP} as {channel}")
+
+                while True:
+                    # Refresh on a timer; steady traffic must not postpone it
+                    remaining = refresh - (time.monotonic() - joined)
+                    if remaining <= 0:
+                        await channel_layer.group_add(GROUP, channel)
+                        joined = time.monotonic()
+                        continue
+
+                    try:
+                        message = await asyncio.wait_for(channel_layer.receive(channel), remaining)
+                    except asyncio.TimeoutError:
+                        continue
+
+                    # Encode once for all sockets, same envelope as SensorReadingsConsumer
+                    await self._send_all(self.sockets, json.dumps({'data': message.get('data', message)}))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Relay error, rejoining in 5 seconds: {e}", exc_info=True)
+                await asyncio.sleep(5)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            now = time.monotonic()
+
+            # Close sockets that have not answered heartbeats
+            idle = [c for c, seen in self.sockets.items() if now - seen > IDLE_TIMEOUT]
+            for consumer in idle:
+                self.sockets.pop(consumer, None)
+            if idle:
+                logger.info(f"Closing {len(idle)} idle WebSocket connections")
+                await asyncio.gather(*(c.close(code=4408) for c in idle), return_exceptions=True)
+
+            # Sensor data doesn't prove the client is alive; only its own
+            # frames do, so prompt every socket that has gone quiet
+            quiet = [c for c, seen in self.sockets.items() if now - seen >= HEARTBEAT_INTERVAL]
+            await self._send_all(quiet, HEARTBEAT)
+
+    async def _send_all(self, consumers, text_data):
+        results = await asyncio.gather(
+            *(c.send(text_data=text_data) for c in list(consumers)),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(r, Exception) for r in results)
+        if failed:
+            logger.debug(f"Failed to send to {failed} WebSocket connections")
+
+
+relay = SensorRelay()
@@ -1,7 +1,14 @@
+from django.conf import settings
 from django.urls import re_path
 from . import consumers
 
+# Lean mode trades per-socket channels for a shared per-process relay
+if settings.WEBSOCKET_LEAN_MODE:
+    consumer = consumers.LeanSensorReadingsConsumer
+else:
+    consumer = consumers.SensorReadingsConsumer
+
 websocket_urlpatterns = [
-    re_path(r'^ws/sensor-readings/$', consumers.SensorReadingsConsumer.as_asgi()),
+    re_path(r'^ws/sensor-readings/$', consumer.as_asgi()),
 ]
 
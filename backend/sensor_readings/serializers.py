@@ -1,8 +1,13 @@
 from rest_framework import serializers
-from .models import SensorReading
+from .models import Sensor, SensorReading
+from .registry import resolve_sensor
 
 
 class SensorReadingSerializer(serializers.ModelSerializer):
+    # Stored on the Sensor registry row; exposed flat for backward compatibility
+    sensor_id = serializers.CharField(max_length=100)
+    metadata = serializers.JSONField(required=False, default=dict)
+
     class Meta:
         model = SensorReading
         fields = ['id', 'sensor_id', 'value', 'timestamp', 'metadata', 'created_at', 'updated_at']
@@ -20,3 +25,13 @@ class SensorReadingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("sensor_id cannot be empty")
         return value.strip()
 
+    def create(self, validated_data):
+        """Resolve sensor_id/metadata to a registry key before inserting"""
+        sensor_id = validated_data.pop('sensor_id')
+        metadata = validated_data.pop('metadata', {})
+        key, sensor_id, metadata = resolve_sensor(sensor_id, metadata)
+
+        # In-memory instance of the existing row, so the response
+        # can be serialized without re-fetching the registry row
+        validated_data['sensor_key'] = Sensor(id=key, sensor_id=sensor_id, metadata=metadata)
+        return super().create(validated_data)
@@ -0,0 +1,400 @@
+import asyncio
+import json
+import time
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.auth import AuthMiddlewareStack
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from . import auth, cache as readings_cache, registry, relay as relay_module
+from .consumers import LeanSensorReadingsConsumer
+from .models import Sensor, SensorReading
+from .serializers import SensorReadingSerializer
+
+
+class SensorRegistryTests(TestCase):
+    def setUp(self):
+        registry.clear_cache()
+
+    def test_identical_metadata_reuses_version(self):
+        first, _, _ = registry.resolve_sensor('s1', {'unit': 'c', 'location': 'room1'})
+        # Key order must not matter
+        second, _, _ = registry.resolve_sensor('s1', {'location': 'room1', 'unit': 'c'})
+
+        self.assertEqual(first, second)
+        self.assertEqual(Sensor.objects.filter(sensor_id='s1').count(), 1)
+
+    def test_new_metadata_bumps_version(self):
+        first, _, _ = registry.resolve_sensor('s1', {'unit': 'c'})
+        second, _, _ = registry.resolve_sensor('s1', {'unit': 'f'})
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(Sensor.objects.get(pk=first).version, 1)
+        self.assertEqual(Sensor.objects.get(pk=second).version, 2)
+
+    def test_cached_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            key, _, _ = registry.resolve_sensor('s1', {'unit': 'c'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.resolve_sensor('s1', {'unit': 'c'})[0], key)
+
+    def test_not_cached_without_commit(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            registry.resolve_sensor('s1', {'unit': 'c'})
+
+        with self.assertNumQueries(1):
+            registry.resolve_sensor('s1', {'unit': 'c'})
+
+    def test_returns_fresh_metadata(self):
+        _, _, metadata = registry.resolve_sensor('s1', {'unit': 'c'})
+        metadata['unit'] = 'changed'
+
+        self.assertEqual(registry.resolve_sensor('s1', {'unit': 'c'})[2], {'unit': 'c'})
+
+    def test_retries_on_concurrent_registration(self):
+        # Another worker registered version 1 after our lookups ran
+        existing = Sensor.objects.create(sensor_id='s1', version=1, metadata={'unit': 'c'})
+        stale = [Sensor.objects.none(), Sensor.objects.none()]
+        real_filter = Sensor.objects.filter
+
+        def racing_filter(*args, **kwargs):
+            return stale.pop(0) if stale else real_filter(*args, **kwargs)
+
+        with mock.patch.object(Sensor.objects, 'filter', side_effect=racing_filter):
+            key, _, _ = registry.resolve_sensor('s1', {'unit': 'c'})
+
+        self.assertEqual(key, existing.pk)
+        self.assertEqual(Sensor.objects.filter(sensor_id='s1').count(), 1)
+
+    def test_expand_payload(self):
+        key, _, _ = registry.resolve_sensor('s1', {'unit': 'c'})
+        payload = registry.expand_payload({'id': 1, 'sensor_key': key, 'value': 2.5})
+
+        self.assertEqual(payload, {'id': 1, 'value': 2.5, 'sensor_id': 's1', 'metadata': {'unit': 'c'}})
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SensorReadingSerializerTests(TestCase):
+    def setUp(self):
+        registry.clear_cache()
+        cache.clear()
+
+    def test_create_payload_is_backward_compatible(self):
+        serializer = SensorReadingSerializer(data={
+            'sensor_id': ' s1 ',
+            'value': 25.5,
+            'metadata': {'unit': 'celsius'},
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertEqual(
+            set(serializer.data),
+            {'id', 'sensor_id', 'value', 'timestamp', 'metadata', 'created_at', 'updated_at'},
+        )
+        self.assertEqual(serializer.data['sensor_id'], 's1')
+        self.assertEqual(serializer.data['metadata'], {'unit': 'celsius'})
+
+    def test_list_round_trip(self):
+        client = APIClient()
+        client.post('/api/v1/sensors-readings/', {'sensor_id': 's1', 'value': 1}, format='json')
+        client.post(
+            '/api/v1/sensors-readings/',
+            {'sensor_id': 's1', 'value': 2, 'metadata': {'unit': 'c'}},
+            format='json',
+        )
+
+        response = client.get('/api/v1/sensors-readings/?sensor_id=s1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r['sensor_id'], r['value'], r['metadata']) for r in response.json()],
+            [('s1', 2.0, {'unit': 'c'}), ('s1', 1.0, {})],
+        )
+        self.assertEqual(SensorReading.objects.count(), 2)
+        self.assertEqual(Sensor.objects.count(), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReadingsListCacheTests(TestCase):
+    url = '/api/v1/sensors-readings/'
+
+    def setUp(self):
+        registry.clear_cache()
+        cache.clear()
+        self.client = APIClient()
+
+    def post_reading(self, sensor_id, value):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {'sensor_id': sensor_id, 'value': value}, format='json')
+
+    def test_not_modified_carries_validators(self):
+        self.post_reading('s1', 1)
+        first = self.client.get(self.url, {'sensor_id': 's1'})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {'sensor_id': 's1'}, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second['Last-Modified'], first['Last-Modified'])
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+        self.assertEqual(second['Cache-Control'], 'no-cache')
+
+    def test_post_reads_own_write(self):
+        self.post_reading('s1', 1)
+        first = self.client.get(self.url, {'sensor_id': 's1'})
+        self.post_reading('s1', 2)
+
+        second = self.client.get(self.url, {'sensor_id': 's1'}, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()), 2)
+
+    def test_reset_rebuilds_markers(self):
+        first_id = self.post_reading('s1', 1).json()['id']
+        readings_cache.get_latest('s1')
+        # Simulate a NOTIFY the listener missed while disconnected
+        with mock.patch('sensor_readings.views.forget_latest'):
+            self.post_reading('s1', 2)
+        self.assertEqual(readings_cache.get_latest('s1')[0], first_id)
+
+        readings_cache.reset_latest()
+
+        self.assertEqual(readings_cache.get_latest('s1')[0], SensorReading.objects.latest('id').id)
+
+    def test_global_marker_does_not_collide_with_sensor_named_star(self):
+        self.post_reading('s1', 1)
+        self.post_reading('*', 2)
+        readings_cache.record_reading(99, 's1', None)
+
+        self.assertEqual(readings_cache.get_latest()[0], 99)
+        self.assertNotEqual(readings_cache.get_latest('*')[0], 99)
+
+
+class FakeChannelLayer:
+    group_expiry = 0.2
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.joins = []
+
+    async def new_channel(self):
+        return 'relay!1'
+
+    async def group_add(self, group, channel):
+        self.joins.append(time.monotonic())
+
+    async def receive(self, channel):
+        return await self.queue.get()
+
+
+class FakeConsumer:
+    def __init__(self, relay, answers_heartbeats=True):
+        self.relay = relay
+        self.answers_heartbeats = answers_heartbeats
+        self.received = []
+        self.close_code = None
+
+    async def send(self, text_data=None):
+        self.received.append(json.loads(text_data))
+        if self.answers_heartbeats and self.received[-1] == {'type': 'heartbeat'}:
+            self.relay.touch(self)
+
+    async def close(self, code=None):
+        self.close_code = code
+
+
+@mock.patch.object(relay_module, 'HEARTBEAT_INTERVAL', 0.1)
+@mock.patch.object(relay_module, 'IDLE_TIMEOUT', 0.3)
+class SensorRelayTests(SimpleTestCase):
+    def setUp(self):
+        self.layer = FakeChannelLayer()
+        patcher = mock.patch.object(relay_module, 'get_channel_layer', return_value=self.layer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.relay = relay_module.SensorRelay()
+
+    async def run_with_traffic(self, seconds, every=0.03):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            await self.layer.queue.put({'type': 'sensor.message', 'data': {'id': 1}})
+            await asyncio.sleep(every)
+        self.relay._task.cancel()
+
+    async def test_refreshes_group_under_steady_traffic(self):
+        self.relay.register(FakeConsumer(self.relay))
+        await self.run_with_traffic(0.55)
+
+        # Initial join plus a refresh every group_expiry / 2
+        self.assertGreaterEqual(len(self.layer.joins), 4)
+
+    async def test_heartbeats_keep_answering_sockets_open_under_traffic(self):
+        answering = FakeConsumer(self.relay)
+        silent = FakeConsumer(self.relay, answers_heartbeats=False)
+        self.relay.register(answering)
+        self.relay.register(silent)
+        await self.run_with_traffic(0.8)
+
+        self.assertIsNone(answering.close_code)
+        self.assertIn({'type': 'heartbeat'}, answering.received)
+        self.assertIn({'data': {'id': 1}}, answering.received)
+        self.assertEqual(silent.close_code, 4408)
+
+
+class TokenAuthTests(SimpleTestCase):
+    user = mock.Mock(pk=7)
+
+    def test_round_trip(self):
+        self.assertEqual(auth.read_token(auth.issue_token(self.user)), 7)
+
+    def test_rejects_bad_tampered_and_foreign_tokens(self):
+        token = auth.issue_token(self.user)
+        tampered = ('x' if token[0] != 'x' else 'y') + token[1:]
+
+        self.assertIsNone(auth.read_token('garbage'))
+        self.assertIsNone(auth.read_token(tampered))
+        self.assertIsNone(auth.read_token(signing.dumps({'user_id': 7}, salt='other')))
+
+    def test_rejects_expired_token(self):
+        issued_at = time.time() - auth.TOKEN_MAX_AGE - 60
+        with mock.patch('django.core.signing.time.time', return_value=issued_at):
+            token = auth.issue_token(self.user)
+
+        self.assertIsNone(auth.read_token(token))
+
+
+@mock.patch.object(relay_module.relay, 'unregister')
+@mock.patch.object(relay_module.relay, 'register')
+class LeanConsumerAuthTests(TestCase):
+    path = '/ws/sensor-readings/'
+
+    def connect(self, application, path, headers=None):
+        """Run a WebSocket handshake; returns (accepted, close code)"""
+        path, _, query_string = path.partition('?')
+        scope = {
+            'type': 'websocket',
+            'path': path,
+            'query_string': query_string.encode(),
+            'headers': headers or [],
+            'subprotocols': [],
+        }
+
+        async def run():
+            communicator = ApplicationCommunicator(application, scope)
+            await communicator.send_input({'type': 'websocket.connect'})
+            message = await communicator.receive_output(timeout=1)
+            if message['type'] == 'websocket.accept':
+                await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(timeout=1)
+            return message['type'] == 'websocket.accept', message.get('code')
+
+        return async_to_sync(run)()
+
+    def lean_app(self):
+        return auth.TokenAuthMiddleware(LeanSensorReadingsConsumer.as_asgi())
+
+    def test_rejects_missing_or_bad_token(self, register, unregister):
+        for path in [self.path, f"{self.path}?token=garbage"]:
+            connected, code = self.connect(self.lean_app(), path)
+            self.assertFalse(connected)
+            self.assertEqual(code, 4401)
+        register.assert_not_called()
+
+    def test_valid_token_connects_without_db_queries(self, register, unregister):
+        user = get_user_model().objects.create_user('dashboard', password='secret')
+        token = auth.issue_token(user)
+
+        with self.assertNumQueries(0):
+            connected, _ = self.connect(self.lean_app(), f"{self.path}?token={token}")
+
+        self.assertTrue(connected)
+        register.assert_called_once()
+
+    def test_session_auth_does_hit_db(self, register, unregister):
+        # Contrast case: proves the query counter sees consumer-side lookups
+        user = get_user_model().objects.create_user('dashboard', password='secret')
+        self.client.force_login(user)
+        cookie = f"sessionid={self.client.cookies['sessionid'].value}".encode()
+        application = AuthMiddlewareStack(LeanSensorReadingsConsumer.as_asgi())
+
+        with CaptureQueriesContext(connection) as queries:
+            connected, _ = self.connect(application, self.path, headers=[(b'cookie', cookie)])
+
+        self.assertTrue(connected)
+        self.assertGreater(len(queries), 0)
+
+
+class WebSocketTokenViewTests(TestCase):
+    url = '/api/v1/sensors-readings/ws-token/'
+
+    def test_anonymous_is_forbidden(self):
+        self.assertEqual(APIClient().get(self.url).status_code, 403)
+
+    def test_authenticated_user_gets_token(self):
+        user = get_user_model().objects.create_user('dashboard', password='secret')
+        client = APIClient()
+        client.force_login(user)
+
+        response = client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(auth.read_token(response.json()['token']), user.pk)
+        self.assertEqual(response.json()['expires_in'], auth.TOKEN_MAX_AGE)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Migrations use PostgreSQL triggers')
+class SensorRegistryMigrationTests(TransactionTestCase):
+    before = [('sensor_readings', '0004_add_created_updated_fields')]
+    after = [('sensor_readings', '0006_remove_inline_sensor_fields')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        # Leave the schema as the other tests expect it
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_round_trip(self):
+        rows = [('s1', {'unit': 'c'}), ('s1', {'unit': 'c'}), ('s1', {'unit': 'f'}), ('s2', {})]
+        OldReading = self.migrate(self.before).get_model('sensor_readings', 'SensorReading')
+        for value, (sensor_id, metadata) in enumerate(rows):
+            OldReading.objects.create(sensor_id=sensor_id, value=value, metadata=metadata)
+
+        new_apps = self.migrate(self.after)
+        NewSensor = new_apps.get_model('sensor_readings', 'Sensor')
+        NewReading = new_apps.get_model('sensor_readings', 'SensorReading')
+
+        self.assertEqual(
+            sorted(NewSensor.objects.values_list('sensor_id', 'version')),
+            [('s1', 1), ('s1', 2), ('s2', 1)],
+        )
+        self.assertEqual(
+            [(r.sensor_key.sensor_id, r.sensor_key.metadata)
+             for r in NewReading.objects.select_related('sensor_key').order_by('id')],
+            rows,
+        )
+
+        # Reverse restores the inline columns on a populated table
+        OldReading = self.migrate(self.before).get_model('sensor_readings', 'SensorReading')
+        self.assertEqual(
+            [(r.sensor_id, r.metadata) for r in OldReading.objects.order_by('id')],
+            rows,
+        )
@@ -3,5 +3,6 @@ from . import views
 
 urlpatterns = [
     path('', views.SensorReadingListCreateView.as_view(), name='sensor_readings'),
+    path('ws-token/', views.WebSocketTokenView.as_view(), name='websocket_token'),
 ]
 
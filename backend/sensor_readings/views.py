@@ -1,8 +1,24 @@
-from rest_framework import status
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .models import SensorReading
 from .serializers import SensorReadingSerializer
+from .cache import LIST_TIMEOUT, forget_latest, get_latest, list_cache_key
+from .auth import TOKEN_MAX_AGE, issue_token
+
+
+def _set_validators(response, etag, last_modified):
+    # Always revalidate; heuristic freshness from Last-Modified would let
+    # browsers and proxies serve a stale list without asking
+    patch_cache_control(response, no_cache=True)
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
 
 
 class SensorReadingListCreateView(APIView):
@@ -13,6 +29,10 @@ class SensorReadingListCreateView(APIView):
     - Query parameters:
       - sensor_id: Filter by sensor ID
       - limit: Limit number of results (default: 100)
+    - Responses carry ETag/Last-Modified derived from the newest reading;
+      conditional requests for unchanged data get 304 Not Modified.
+      Prefer If-None-Match: Last-Modified has one-second resolution, so
+      If-Modified-Since alone can miss a reading made in the same second.
     
     POST /api/v1/sensors/
     - Request body:
@@ -25,19 +45,33 @@ class SensorReadingListCreateView(APIView):
     
     def get(self, request):
         """List sensor readings with optional filtering"""
-        queryset = SensorReading.objects.all().order_by('-timestamp')
-        
-        # Filter by sensor_id if provided
         sensor_id = request.query_params.get('sensor_id', None)
-        if sensor_id:
-            queryset = queryset.filter(sensor_id=sensor_id)
-        
-        # Limit results
         limit = int(request.query_params.get('limit', 100))
-        queryset = queryset[:limit]
-        
-        serializer = SensorReadingSerializer(queryset, many=True)
-        return Response(serializer.data)
+
+        # Newest reading id is kept current by the NOTIFY listener
+        latest_id, last_modified = get_latest(sensor_id)
+        etag = f'"{latest_id}-{limit}"'
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return _set_validators(not_modified, etag, last_modified)
+
+        cache_key = list_cache_key(sensor_id, limit, latest_id)
+        data = cache.get(cache_key)
+        if data is None:
+            queryset = SensorReading.objects.select_related('sensor_key').order_by('-timestamp')
+
+            # Filter by sensor_id if provided
+            if sensor_id:
+                queryset = queryset.filter(sensor_key__sensor_id=sensor_id)
+
+            # Limit results
+            queryset = queryset[:limit]
+
+            data = SensorReadingSerializer(queryset, many=True).data
+            cache.set(cache_key, data, LIST_TIMEOUT)
+
+        return _set_validators(Response(data), etag, last_modified)
     
     def post(self, request):
         """Create a new sensor reading"""
@@ -47,6 +81,9 @@ class SensorReadingListCreateView(APIView):
             # Create the sensor reading
             # This will trigger the PostgreSQL trigger which sends NOTIFY
             reading = serializer.save()
+
+            # Don't wait for the listener: let this client read its own write
+            transaction.on_commit(lambda: forget_latest(reading.sensor_id))
             
             return Response(
                 {
@@ -59,3 +96,20 @@ class SensorReadingListCreateView(APIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+class WebSocketTokenView(APIView):
+    """
+    Issue a signed token for lean-mode WebSocket connections.
+
+    GET /api/v1/sensors/ws-token/
+    - Requires an authenticated session
+    - Connect with ws://.../ws/sensor-readings/?token=<token>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return a token for the current user"""
+        return Response({
+            'token': issue_token(request.user),
+            'expires_in': TOKEN_MAX_AGE,
+        })
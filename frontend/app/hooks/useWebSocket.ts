@@ -10,6 +10,7 @@ interface SensorData {
 
 interface UseWebSocketOptions {
   url: string;
+  tokenUrl?: string;
   onMessage?: (data: SensorData) => void;
   onError?: (error: Event) => void;
   onOpen?: () => void;
@@ -18,9 +19,29 @@ interface UseWebSocketOptions {
   reconnectInterval?: number;
 }
 
+// Lean server mode authenticates sockets with a signed, expiring token.
+// Fetch a fresh one for every (re)connect and append it as ?token=.
+async function withToken(wsUrl: string, tokenUrl?: string): Promise<string> {
+  if (!tokenUrl) {
+    return wsUrl;
+  }
+  try {
+    const response = await fetch(tokenUrl, { credentials: 'include' });
+    if (!response.ok) {
+      return wsUrl;
+    }
+    const { token } = await response.json();
+    return `${wsUrl}${wsUrl.includes('?') ? '&' : '?'}token=${encodeURIComponent(token)}`;
+  } catch (err) {
+    console.error('Error fetching WebSocket token:', err);
+    return wsUrl;
+  }
+}
+
 export function useWebSocket(options: UseWebSocketOptions) {
   const {
     url,
+    tokenUrl,
     onMessage,
     onError,
     onOpen,
@@ -58,9 +79,14 @@ export function useWebSocket(options: UseWebSocketOptions) {
       : `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}${url}`;
 
     let shouldReconnect = reconnect;
-    const connect = () => {
+    let unmounted = false;
+    const connect = async () => {
       try {
-        const ws = new WebSocket(wsUrl);
+        const connectUrl = await withToken(wsUrl, tokenUrl);
+        if (unmounted) {
+          return;
+        }
+        const ws = new WebSocket(connectUrl);
 
         ws.onopen = () => {
           setIsConnected(true);
@@ -72,6 +98,11 @@ export function useWebSocket(options: UseWebSocketOptions) {
         ws.onmessage = (event) => {
           try {
             const parsed = JSON.parse(event.data);
+            // Lean server mode sends heartbeats; any reply keeps the socket alive
+            if (parsed.type === 'heartbeat') {
+              ws.send(JSON.stringify({ type: 'pong' }));
+              return;
+            }
             const sensorData: SensorData = parsed.data || parsed;
             setLatestData(sensorData);
             onMessageRef.current?.(sensorData);
@@ -124,6 +155,7 @@ export function useWebSocket(options: UseWebSocketOptions) {
     return () => {
       // Disable reconnection on cleanup
       shouldReconnect = false;
+      unmounted = true;
       if (reconnectTimeoutRef.current) {
         clearTimeout(reconnectTimeoutRef.current);
         reconnectTimeoutRef.current = null;
@@ -134,9 +166,9 @@ export function useWebSocket(options: UseWebSocketOptions) {
         wsRef.current = null;
       }
     };
-    // Only depend on url and reconnect setting - callbacks are handled via refs
+    // Only depend on url, tokenUrl and reconnect setting - callbacks are handled via refs
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [url, reconnect]);
+  }, [url, tokenUrl, reconnect]);
 
   // Memoize send function to prevent unnecessary re-renders
   const send = useCallback((data: string | object) => {
@@ -246,6 +246,8 @@ export default function Index() {
 
   const { isConnected, latestData, error } = useWebSocket({
     url: 'ws://localhost:8000/ws/sensor-readings/',
+    // Only needed when the backend runs with WEBSOCKET_LEAN_MODE in production
+    tokenUrl: 'http://localhost:8000/api/v1/sensors-readings/ws-token/',
     onMessage: handleMessage,
     onError: handleError,
   });